@@ -1,23 +1,58 @@
 import serial
+import sys
 import time
 import threading
+import queue
+import weakref
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, messagebox
+import tkinter.font as tkfont
 import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+
+def configure_logging():
+    """设置日志系统 - 由程序入口调用一次"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('ebm30_controller_final.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+
 class EBM30N6_FEG_Controller:
     
     def __init__(self):
         self.ser = None
         self.monitoring = False
         self.monitor_thread = None
+        self._stop_event = threading.Event()
         self._command_lock = threading.Lock()
-        self._connection_lock = threading.Lock()
+        # connect()内部会调用disconnect()，因此使用可重入锁
+        self._connection_lock = threading.RLock()
+        
+        # 接收缓冲区 - 按换行切分出完整的响应帧
+        self._rx = bytearray()
+        
+        # 置位后正在等待的串口读取立即放弃，断开连接时无需等满响应超时
+        self._cancel_io = threading.Event()
+        
+        # 等待单条命令（或一批命令）响应的最长时间（秒）
+        self.RESPONSE_TIMEOUT = 2.0
         
         # 加热电流限制阈值 - 默认值
         self.HEATER_CURRENT_LIMIT = 100
         
+        # 安全警告回调 on_warning(title, message)，由GUI设置；未设置时仅记录日志
+        self.on_warning = None
+        
         # 默认端口设为COM3
         self.DEFAULT_PORT = "COM3"
         
@@ -38,6 +73,9 @@ class EBM30N6_FEG_Controller:
         self.suppressor_enabled = False
         self.extractor_enabled = False
         
+        # 最近一次02响应解析出的状态寄存器，每收到新的状态帧时更新
+        self._status_int = None
+        
         # 系统状态
         self.system_status = {
             "Power On Reset": False, "Vacuum Interlock": False,
@@ -50,19 +88,85 @@ class EBM30N6_FEG_Controller:
             "Rx CRC Error": False, "Rx Error": False
         }
         
-        self.setup_logger()
+        # 状态寄存器位定义: (状态名称, 位掩码)
+        self._STATUS_BITS = [
+            ("Power On Reset", 1 << 8), ("Vacuum Interlock", 1 << 10),
+            ("Input Voltage out of range", 1 << 12), ("Beam Over Voltage Trip", 1 << 13),
+            ("Beam Over Current Trip", 1 << 14), ("Extractor Over Current Trip", 1 << 15),
+            ("Heater Open Circuit", 1 << 16), ("Heater Current Trip", 1 << 17),
+            ("Over Temperature", 1 << 18), ("Suppressor Over Current Trip", 1 << 19),
+            ("Arc Trip", 1 << 20), ("Suppressor Regulation Trip", 1 << 21),
+            ("Heater Regulation Trip", 1 << 22), ("Extractor Regulation Trip", 1 << 23),
+            ("Rx CRC Error", 1 << 30), ("Rx Error", 1 << 31)
+        ]
+        
+        # 字节1的位0-3分别对应各输出的ON/OFF状态: (属性名, 位掩码)
+        self._OUTPUT_BITS = [
+            ("beam_enabled", 1 << 0), ("extractor_enabled", 1 << 1),
+            ("suppressor_enabled", 1 << 2), ("heater_enabled", 1 << 3)
+        ]
+        
+        # 每个监控周期批量发送的监测命令: (命令, 参数, 属性名, 缩放系数, 名称)
+        self.MONITOR_COMMANDS = [
+            ("08", "1", "beam_voltage", 1.0, "束电压"),
+            ("0E", "", "beam_current", 1.0, "束电流"),
+            ("28", "1", "heater_current", 1.0, "加热器电流"),
+            ("26", "", "heater_voltage", 1e-3, "加热器电压"),  # 设备返回mV
+            ("14", "1", "extractor_voltage", 1.0, "提取器电压"),
+            ("1A", "", "extractor_current", 1.0, "提取器电流"),
+            ("1E", "1", "suppressor_voltage", 1.0, "抑制器电压"),
+            ("24", "", "suppressor_current", 1.0, "抑制器电流"),
+            ("1C", "", "extractor_trip_current", 1.0, "提取器跳闸电流")
+        ]
+        # 属性名 -> MONITOR_COMMANDS中的对应行，供单独读取某一监测值
+        self._monitor_by_attr = {row[2]: row for row in self.MONITOR_COMMANDS}
+        
+        # 发布变化的数据: 监控周期结束后，将与上次发布相比变化的字段合并到_pending_changes，
+        # 并设置sample_ready事件。界面来不及取走时新值直接覆盖旧值，只保留最新采样
+        self._data_lock = threading.Lock()  # 保护测量值、状态及待发布的变化
+        self.sample_ready = threading.Event()
+        self._pending_changes = {}
+        self._published = {}
+        
+        # 连接时的初始化序列 - 按照官方GUI的顺序
+        self.INIT_COMMANDS = [
+            ("01", "7F"),  # Get Connection
+            ("0199", "0"),  # Set working mode
+            ("050", ""),    # Get firmware version - main
+            ("051", ""),    # Get firmware version - floating deck
+            ("080", ""),    # Get beam voltage target
+            ("081", "")     # Get beam voltage monitor
+        ]
+        
+        # 03命令的输出开关参数: 电源 -> (开启, 关闭)
+        self.SUPPLY_SWITCH_ARGS = {
+            "Beam": ("00", "01"),
+            "Extractor": ("02", "03"),
+            "Suppressor": ("04", "05"),
+            "Heater": ("06", "07")
+        }
+        
+        # 发送缓冲区 - 非固定命令直接在其中构建命令帧，避免每条命令分配新对象
+        self._txbuf = bytearray(64)
+        self._txview = memoryview(self._txbuf)
+        self._HEX_DIGITS = b"0123456789ABCDEF"
+        
+        # 固定命令帧缓存: (命令, 参数) -> 完整命令帧
+        self._frame_cache = {}
+        self._prime_frame_cache()
+        
+        self.logger = logger
     
-    def setup_logger(self):
-        """设置日志系统"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('ebm30_controller_final.log'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+    def _prime_frame_cache(self):
+        """预先构建所有固定命令的命令帧"""
+        fixed_commands = [(cmd, args) for cmd, args, _, _, _ in self.MONITOR_COMMANDS]
+        fixed_commands += self.INIT_COMMANDS
+        fixed_commands.append(("02", ""))
+        for on_arg, off_arg in self.SUPPLY_SWITCH_ARGS.values():
+            fixed_commands += [("03", on_arg), ("03", off_arg)]
+        
+        for cmd, args in fixed_commands:
+            self._frame_cache[(cmd, args)] = self.build_frame(cmd, args)
     
     def is_connected(self):
         """检查连接状态"""
@@ -86,25 +190,35 @@ class EBM30N6_FEG_Controller:
             return False
         
         try:
-            # 关闭所有输出
-            self.switch_supply("Beam", False)
-            self.switch_supply("Heater", False)
-            self.switch_supply("Suppressor", False)
-            self.switch_supply("Extractor", False)
+            # 关闭所有输出 - 四条开关命令一次批量写入
+            off_commands = [("03", off_arg) for _, off_arg in self.SUPPLY_SWITCH_ARGS.values()]
+            off_results = self.send_commands_batch(off_commands)
+            if not all(off_results):
+                self.logger.error("复位时关闭输出失败")
             
+            # 等待输出关断稳定后再清零设定值
             time.sleep(0.5)
             
-            # 重置参数到默认值
-            self.set_beam_voltage(0)
-            self.set_heater_current(0)
-            self.set_suppressor_voltage(0)
-            self.set_extractor_voltage(0)
+            # 重置参数到默认值 - 即使关闭输出失败也要清零设定值，经由set_*方法做范围检查
+            setpoint_results = [
+                self.set_beam_voltage(0),
+                self.set_heater_current(0),
+                self.set_suppressor_voltage(0),
+                self.set_extractor_voltage(0)
+            ]
+            if not all(setpoint_results):
+                self.logger.error("复位时清零设定值失败")
+            
+            # 统一刷新一次状态
+            self.get_short_status()
             
-            self.logger.info("设备复位完成")
-            return True
+            if all(off_results) and all(setpoint_results):
+                self.logger.info("设备复位完成")
+                return True
+            return False
             
         except Exception as e:
-            self.logger.error(f"复位设备时出错: {e}")
+            self.logger.error("复位设备时出错: %s", e)
             return False
     
     def connect(self, port=None, baudrate=115200):
@@ -119,44 +233,39 @@ class EBM30N6_FEG_Controller:
                     self.logger.warning("设备已连接，先断开")
                     self.disconnect()
                 
-                self.logger.info(f"正在连接到 {port}...")
+                self.logger.info("正在连接到 %s...", port)
+                self._set_low_latency(port)
                 self.ser = serial.Serial(
                     port=port,
                     baudrate=baudrate,
                     bytesize=serial.EIGHTBITS,
                     parity=serial.PARITY_NONE,
                     stopbits=serial.STOPBITS_ONE,
-                    timeout=2,
+                    timeout=0.2,
                     write_timeout=2
                 )
+                self._configure_read_timeouts()
                 
                 # 清空缓冲区
                 self.ser.reset_input_buffer()
                 self.ser.reset_output_buffer()
+                self._rx.clear()
+                self._cancel_io.clear()
                 
                 # 发送初始化序列 - 修复关键：按照官方GUI的顺序
                 time.sleep(0.5)
-                init_commands = [
-                    ("01", "7F"),  # Get Connection
-                    ("0199", "0"),  # Set working mode
-                    ("050", ""),    # Get firmware version - main
-                    ("051", ""),    # Get firmware version - floating deck
-                    ("080", ""),    # Get beam voltage target
-                    ("081", "")     # Get beam voltage monitor
-                ]
-                
-                for cmd, arg in init_commands:
+                for cmd, arg in self.INIT_COMMANDS:
                     result = self.send_command(cmd, arg)
                     if result:
-                        self.logger.debug(f"初始化命令 {cmd} 成功")
+                        self.logger.debug("初始化命令 %s 成功", cmd)
                     else:
-                        self.logger.warning(f"初始化命令 {cmd} 无响应")
+                        self.logger.warning("初始化命令 %s 无响应", cmd)
                     time.sleep(0.1)
                 
                 # 测试连接
                 test_result = self.send_command("02")
                 if test_result:
-                    self.logger.info(f"成功连接到设备: {port}")
+                    self.logger.info("成功连接到设备: %s", port)
                     return True
                 else:
                     self.logger.error("连接测试失败")
@@ -164,7 +273,7 @@ class EBM30N6_FEG_Controller:
                     return False
                     
             except Exception as e:
-                self.logger.error(f"连接失败: {e}")
+                self.logger.error("连接失败: %s", e)
                 if self.ser:
                     try:
                         self.ser.close()
@@ -172,96 +281,276 @@ class EBM30N6_FEG_Controller:
                         pass
                 return False
     
+    def _set_low_latency(self, port):
+        """将USB转串口芯片的延迟定时器设为1ms（默认16ms），失败时保持默认"""
+        if sys.platform.startswith("linux"):
+            import os
+            import subprocess
+            
+            device = os.path.realpath(port)
+            if not device.startswith("/dev/tty"):
+                return
+            tty = os.path.basename(device)
+            latency_path = f"/sys/bus/usb-serial/devices/{tty}/latency_timer"
+            try:
+                with open(latency_path, "w") as f:
+                    f.write("1")
+                self.logger.info("已设置 %s 延迟定时器为1ms", tty)
+                return
+            except OSError as e:
+                self.logger.debug("无法写入 %s: %s", latency_path, e)
+            
+            # 非FTDI设备或没有写权限时，退而使用setserial的low_latency标志
+            try:
+                subprocess.run(["setserial", port, "low_latency"], check=True, timeout=2,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                self.logger.info("已设置 %s 为low_latency模式", port)
+            except (OSError, subprocess.SubprocessError) as e:
+                self.logger.debug("setserial low_latency 失败: %s", e)
+        
+        elif sys.platform == "win32":
+            # 需要安装FTDI D2XX驱动的Python封装ftd2xx，且必须在打开COM口之前设置
+            try:
+                import ftd2xx
+            except ImportError:
+                return
+            
+            from serial.tools import list_ports
+            
+            try:
+                # 只处理该COM口对应的FTDI设备（VID 0x0403），按序列号打开，不打开其他设备
+                info = next((p for p in list_ports.comports() if p.device.upper() == port.upper()), None)
+                if info is None or info.vid != 0x0403 or not info.serial_number:
+                    return
+                
+                # VCP驱动报告的序列号可能在D2XX序列号后附加通道字母(如"A")
+                serials = [s.decode() for s in ftd2xx.listDevices() or []]
+                matches = [s for s in serials if s and info.serial_number.startswith(s)]
+                if not matches:
+                    return
+                serial_number = max(matches, key=len)
+                
+                dev = ftd2xx.openEx(serial_number.encode())
+                try:
+                    dev.setLatencyTimer(1)
+                    self.logger.info("已设置 %s (%s) 延迟定时器为1ms", port, serial_number)
+                finally:
+                    dev.close()
+            except Exception as e:
+                self.logger.debug("通过ftd2xx设置延迟定时器失败: %s", e)
+    
+    def _configure_read_timeouts(self):
+        """Windows下设置读超时：有字节到达即返回，无数据时最多等待timeout"""
+        if sys.platform != "win32":
+            return
+        
+        try:
+            import ctypes
+            from serial import win32
+            
+            self.ser.set_buffer_size(rx_size=4096)
+            
+            timeouts = win32.COMMTIMEOUTS()
+            timeouts.ReadIntervalTimeout = win32.MAXDWORD
+            timeouts.ReadTotalTimeoutMultiplier = win32.MAXDWORD
+            timeouts.ReadTotalTimeoutConstant = int(self.ser.timeout * 1000)
+            timeouts.WriteTotalTimeoutConstant = int(self.ser.write_timeout * 1000)
+            if not win32.SetCommTimeouts(self.ser._port_handle, ctypes.byref(timeouts)):
+                self.logger.warning("设置串口超时失败: %s", ctypes.WinError())
+        except Exception as e:
+            self.logger.warning("设置串口超时失败: %s", e)
+    
     def disconnect(self):
         """断开设备连接"""
         with self._connection_lock:
             self.logger.info("开始断开连接...")
             
-            # 先停止监控
-            self.stop_monitoring()
+            # 中止正在进行的串口读取
+            self._cancel_io.set()
             
-            # 等待监控线程完全停止
-            time.sleep(0.5)
+            # 先停止监控（等待监控线程退出）
+            self.stop_monitoring()
             
-            # 关闭串口
-            if self.ser:
+            # 先清空引用，让正在等待的命令尽快看到连接已断开，再关闭串口
+            ser = self.ser
+            self.ser = None
+            if ser:
                 try:
-                    if self.ser.is_open:
-                        self.ser.close()
+                    if ser.is_open:
+                        ser.close()
                         self.logger.info("串口已关闭")
                 except Exception as e:
-                    self.logger.error(f"关闭串口时出错: {e}")
-                finally:
-                    self.ser = None
+                    self.logger.error("关闭串口时出错: %s", e)
             
             self.logger.info("设备已断开连接")
     
     def calculate_checksum(self, message):
-        """计算校验和 - 修复版本，基于诊断结果"""
+        """计算校验和 - 修复版本，基于诊断结果
+        
+        message为去掉冒号后的命令字节，返回整数校验和
+        """
         # 根据诊断结果，使用简单的算法
-        loop_total = sum(ord(char) for char in message)
+        loop_total = sum(message)
         
         # 使用诊断中有效的参数
         HV_CHECKSUM_NEGATION = 0x1E0
         HV_LOWER_CHECKSUM_BOUND = 0x40
         HV_UPPER_CHECKSUM_BOUND = 0x7F
         
-        checksum = HV_CHECKSUM_NEGATION - loop_total
-        checksum &= HV_UPPER_CHECKSUM_BOUND
-        checksum |= HV_LOWER_CHECKSUM_BOUND
-        
-        if checksum < HV_LOWER_CHECKSUM_BOUND or checksum > HV_UPPER_CHECKSUM_BOUND:
-            # 如果超出范围，使用备选算法
-            checksum = (0x100 - (loop_total & 0xFF)) & 0x7F
-            checksum |= HV_LOWER_CHECKSUM_BOUND
-        
-        return f"{checksum:02X}"
+        # 掩码后结果必然落在[0x40, 0x7F]范围内
+        checksum = (HV_CHECKSUM_NEGATION - loop_total) & HV_UPPER_CHECKSUM_BOUND
+        return checksum | HV_LOWER_CHECKSUM_BOUND
+    
+    def _encode_frame(self, cmd, args=None):
+        """在发送缓冲区中构建命令帧，返回指向该帧的memoryview
+        
+        返回的视图在下一次构建前有效，调用方需持有_command_lock
+        """
+        # 构建命令 - 关键修复：根据诊断结果调整格式
+        # 有参数时，参数直接跟在命令后面，没有空格
+        buf = self._txbuf
+        buf[0] = 0x3A  # ':'
+        n = 1
+        for part in (cmd, args):
+            if part:
+                if isinstance(part, str):
+                    part = part.encode("ascii")
+                end = n + len(part)
+                if end + 4 > len(buf):
+                    raise ValueError(f"命令过长: {cmd}{args}")
+                buf[n:end] = part
+                n = end
+        
+        checksum = self.calculate_checksum(self._txview[1:n])  # 去掉冒号计算校验和
+        
+        # 构建完整命令：基础命令 + 空格 + 校验和 + 换行
+        buf[n] = 0x20  # ' '
+        buf[n + 1] = self._HEX_DIGITS[checksum >> 4]
+        buf[n + 2] = self._HEX_DIGITS[checksum & 0xF]
+        buf[n + 3] = 0x0A  # '\n'
+        return self._txview[:n + 4]
+    
+    def build_frame(self, cmd, args=None):
+        """构建完整的命令帧（字节）"""
+        # 固定命令直接使用缓存的命令帧
+        frame = self._frame_cache.get((cmd, args or ""))
+        if frame is None:
+            frame = bytes(self._encode_frame(cmd, args))
+        return frame
     
     def send_command(self, cmd, args=None):
         """发送命令到设备 - 修复版本"""
-        if not self.is_connected():
-            self.logger.warning("尝试发送命令但设备未连接")
-            return None
-        
         with self._command_lock:
+            # 在锁内取一次串口对象，之后只使用这个局部引用
+            ser = self.ser
+            if ser is None or not ser.is_open:
+                self.logger.warning("尝试发送命令但设备未连接")
+                return None
+            
             try:
-                # 构建命令 - 关键修复：根据诊断结果调整格式
-                # 对于没有参数的命令，直接发送命令
-                if args is None or args == "":
-                    base_cmd = f":{cmd}"
-                else:
-                    # 有参数时，参数直接跟在命令后面，没有空格
-                    base_cmd = f":{cmd}{args}"
-                
-                checksum = self.calculate_checksum(base_cmd[1:])  # 去掉冒号计算校验和
-                
-                # 构建完整命令：基础命令 + 空格 + 校验和 + 换行
-                full_cmd = f"{base_cmd} {checksum}\n"
+                frame = self._frame_cache.get((cmd, args or ""))
+                if frame is None:
+                    frame = self._encode_frame(cmd, args)
                 
-                self.logger.debug(f"发送命令: {full_cmd.strip()}")
-                
-                # 双重检查连接状态
-                if not self.is_connected():
-                    self.logger.error("发送命令前连接已断开")
-                    return None
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("发送命令: %s", bytes(frame).decode().strip())
                 
                 # 发送命令
-                self.ser.write(full_cmd.encode())
-                time.sleep(0.05)
+                self._discard_stale_input(ser)
+                ser.write(frame)
                 
-                # 读取响应
-                response = self.ser.readline().decode().strip()
+                # 读取响应 - 收到匹配的响应帧即返回，无需等待固定延时
+                deadline = time.monotonic() + self.RESPONSE_TIMEOUT
+                result = self._recv_frame(ser, (cmd[:2],), deadline)
                 
-                if response:
-                    self.logger.debug(f"接收响应: {response}")
-                    return self.parse_response(response)
-                else:
+                if result is None:
                     self.logger.warning("命令无响应")
-                    return None
+                return result
+                    
+            except Exception as e:
+                self.logger.error("通信错误: %s", e)
+                return None
+    
+    def send_commands_batch(self, commands):
+        """批量发送命令 - 一次写入所有命令帧，再依次读取响应
+        
+        返回与commands顺序一致的结果列表，无响应的命令对应None
+        """
+        results = [None] * len(commands)
+        
+        with self._command_lock:
+            ser = self.ser
+            if ser is None or not ser.is_open:
+                self.logger.warning("尝试发送命令但设备未连接")
+                return results
+            
+            try:
+                frames = [self.build_frame(cmd, args) for cmd, args in commands]
+                self._discard_stale_input(ser)
+                ser.write(b"".join(frames))
+                
+                # 按回显的命令ID将响应分配给第一个尚未应答的同ID命令
+                pending = [cmd[:2] for cmd, _ in commands]
+                deadline = time.monotonic() + self.RESPONSE_TIMEOUT
+                for _ in range(len(commands)):
+                    result = self._recv_frame(ser, pending, deadline)
+                    if result is None:
+                        self.logger.warning("批量命令响应超时")
+                        break
                     
+                    index = pending.index(result["command"][:2])
+                    pending[index] = None
+                    results[index] = result
+                
             except Exception as e:
-                self.logger.error(f"通信错误: {e}")
+                self.logger.error("通信错误: %s", e)
+        
+        return results
+    
+    def _discard_stale_input(self, ser):
+        """发送前清空接收缓冲区
+        
+        持有_command_lock时没有未完成的请求，此时收到的数据都是之前超时命令的迟到响应；
+        若不清除，同ID的下一条命令会把迟到响应当作本次结果，该通道将一直滞后一个读数
+        """
+        if self._rx or ser.in_waiting:
+            self.logger.debug("丢弃过期的接收数据: %r", bytes(self._rx))
+            self._rx.clear()
+            ser.reset_input_buffer()
+    
+    def _recv_frame(self, ser, expected_ids, deadline):
+        """从ser接收一帧命令ID在expected_ids中的响应
+        
+        从串口读取数据到接收缓冲区，按换行切分出完整响应帧；
+        命令ID不匹配的帧（例如之前超时命令的迟到响应）被丢弃。
+        在deadline（time.monotonic()时间）之前未收到匹配帧或读取被中止则返回None
+        """
+        while True:
+            newline = self._rx.find(b"\n")
+            if newline != -1:
+                response = self._rx[:newline].decode(errors="replace").strip()
+                del self._rx[:newline + 1]
+                if not response:
+                    continue
+                
+                self.logger.debug("接收响应: %s", response)
+                result = self.parse_response(response)
+                if result and result["command"][:2] in expected_ids:
+                    return result
+                self.logger.warning("丢弃过期或无效的响应: %s", response)
+                continue
+            
+            if self._cancel_io.is_set() or time.monotonic() >= deadline:
                 return None
+            
+            self._rx += ser.read(ser.in_waiting or 1)
+    
+    def _verify_checksum(self, data_part, checksum):
+        """校验响应帧的校验和"""
+        try:
+            return int(checksum, 16) == self.calculate_checksum(data_part.encode())
+        except (TypeError, ValueError):
+            return False
     
     def parse_response(self, response):
         """解析设备响应"""
@@ -295,71 +584,96 @@ class EBM30N6_FEG_Controller:
             cmd = parts[0]
             data = parts[1:] if len(parts) > 1 else []
             
-            return {
+            # 响应校验和算法尚未经设备确认，校验失败仅记录不丢弃 - 只在调试日志开启时计算
+            if self.logger.isEnabledFor(logging.DEBUG) and not self._verify_checksum(data_part, checksum):
+                self.logger.debug("响应校验和不匹配: %s", response)
+            
+            result = {
                 "command": cmd, 
                 "data": data, 
                 "checksum": checksum,
                 "raw": response
             }
             
+            # 状态响应直接解析为整数，后续无需再从十六进制字符串转换
+            if cmd[:2] == "02":
+                result["status"] = self._parse_status(cmd, data)
+            
+            return result
+            
         except Exception as e:
-            self.logger.error(f"解析响应错误: {e}")
+            self.logger.error("解析响应错误: %s", e)
+            return None
+    
+    def _parse_status(self, cmd, data):
+        """将02命令响应中的状态寄存器解析为整数，无效时返回None"""
+        status_hex = data[0] if data else (cmd[2:] or "00000000")
+        if len(status_hex) < 8:
+            return None
+        
+        try:
+            return int(status_hex[:8], 16)
+        except ValueError:
+            self.logger.error("无效的状态数据: %s", status_hex)
             return None
 
     # 其余的方法保持不变...
     def get_short_status(self):
         """02 - 获取状态"""
         result = self.send_command("02")
-        if result:
-            # 从响应中提取状态信息
-            status_data = result["command"][2:] if len(result["command"]) > 2 else "00000000"
-            if result["data"]:
-                status_data = result["data"][0]
-            
-            self.update_system_status(status_data)
-            self.update_output_states(status_data)
+        with self._data_lock:
+            self._apply_short_status(result)
         return result
     
-    def update_output_states(self, status_hex):
-        """从状态寄存器更新输出状态"""
-        try:
-            if len(status_hex) >= 8:
-                status_int = int(status_hex[:8], 16)
-                # 字节1的位0-3分别对应各输出的ON/OFF状态
-                self.beam_enabled = bool(status_int & (1 << 0))
-                self.extractor_enabled = bool(status_int & (1 << 1))
-                self.suppressor_enabled = bool(status_int & (1 << 2))
-                self.heater_enabled = bool(status_int & (1 << 3))
-        except Exception as e:
-            self.logger.error(f"更新输出状态错误: {e}")
+    def _apply_short_status(self, result):
+        """根据02命令的响应更新状态"""
+        self._status_int = result.get("status") if result else None
+        if self._status_int is not None:
+            self.update_system_status()
+            self.update_output_states()
     
-    def switch_supply(self, supply, state):
-        """03 - 控制输出开关"""
-        cmd_map = {
-            "Beam": ("00", "01"),
-            "Extractor": ("02", "03"),
-            "Suppressor": ("04", "05"),
-            "Heater": ("06", "07")
-        }
-        
-        if supply in cmd_map:
-            cmd = cmd_map[supply][0] if state else cmd_map[supply][1]
+    def update_output_states(self, status_hex=None):
+        """从状态寄存器更新输出状态
+        
+        status_hex仅为兼容旧的调用方式而保留，已不再使用 - 状态取自最近一次02响应解析出的_status_int
+        """
+        status_int = self._status_int
+        if status_int is None:
+            # 尚未收到有效的状态响应
+            return
+        for attr, mask in self._OUTPUT_BITS:
+            setattr(self, attr, (status_int & mask) != 0)
+    
+    def switch_supply(self, supply, state, refresh_status=True):
+        """03 - 控制输出开关
+        
+        连续切换多路输出时可传入refresh_status=False，最后统一调用get_short_status()
+        """
+        if supply in self.SUPPLY_SWITCH_ARGS:
+            on_arg, off_arg = self.SUPPLY_SWITCH_ARGS[supply]
+            cmd = on_arg if state else off_arg
             result = self.send_command("03", cmd)
             
             if result:
-                time.sleep(0.2)
                 # 更新状态
-                self.get_short_status()
+                if refresh_status:
+                    self.get_short_status()
                 return True
             return False
         return False
     
+    def _fmt_vd1(self, value, width):
+        """将设定值格式化为一位小数、最小宽度为width的补零ASCII字节
+        
+        与f"{value:0{width}.1f}".encode()结果相同，直接生成bytes，省去一次str编码
+        """
+        return b"%0*.1f" % (width, value)
+    
     def set_beam_voltage(self, voltage):
         """09 - 设置束电压"""
         if 0 <= voltage <= 30000:
             # 格式化为xxxxx.x格式
-            voltage_str = f"{voltage:06.1f}"
-            return self.send_command("09", voltage_str)
+            return self.send_command("09", self._fmt_vd1(voltage, 6))
         return None
     
     def set_heater_current(self, current):
@@ -368,33 +682,35 @@ class EBM30N6_FEG_Controller:
         if current > self.HEATER_CURRENT_LIMIT:
             # 超过限制时设为限制值，而不是0
             limited_current = self.HEATER_CURRENT_LIMIT
-            messagebox.showwarning(
+            self._warn_async(
                 "Safety Warning",
                 f"Warning: Heater current setting exceeds maximum limit!\n"
                 f"Requested value: {current} mA\n"
                 f"Automatically set to maximum allowed: {limited_current} mA"
             )
-            # 递归调用设置限制值
-            return self.set_heater_current(limited_current)
+            current = limited_current
         
         if 0 <= current <= 3000:
             # 格式化为xxxx.x格式
-            current_str = f"{current:05.1f}"
-            return self.send_command("29", current_str)
+            return self.send_command("29", self._fmt_vd1(current, 5))
         return None
     
+    def _warn_async(self, title, message):
+        """发出安全警告 - 不阻塞调用线程"""
+        self.logger.warning("%s", message.replace("\n", " "))
+        if self.on_warning:
+            self.on_warning(title, message)
+    
     def set_suppressor_voltage(self, voltage):
         """1F - 设置抑制器电压"""
         if 0 <= voltage <= 1000:
-            voltage_str = f"{voltage:06.1f}"
-            return self.send_command("1F", voltage_str)
+            return self.send_command("1F", self._fmt_vd1(voltage, 6))
         return None
     
     def set_extractor_voltage(self, voltage):
         """15 - 设置提取器电压"""
         if 0 <= voltage <= 10000:
-            voltage_str = f"{voltage:06.1f}"
-            return self.send_command("15", voltage_str)
+            return self.send_command("15", self._fmt_vd1(voltage, 6))
         return None
     
     def set_extractor_trip_current(self, current):
@@ -407,139 +723,45 @@ class EBM30N6_FEG_Controller:
     
     def get_beam_voltage_monitor(self):
         """08 - 获取束电压监测值"""
-        result = self.send_command("08", "1")
-        if result:
-            try:
-                # 根据诊断结果调整解析逻辑
-                if result["data"]:
-                    voltage_str = result["data"][0]
-                else:
-                    # 从command字段提取
-                    voltage_str = result["command"][2:]
-                self.beam_voltage = float(voltage_str)
-                return self.beam_voltage
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析束电压错误: {e}")
-        return None
+        return self._read_monitor("beam_voltage")
     
     def get_beam_current_monitor(self):
         """0E - 获取束电流监测值"""
-        result = self.send_command("0E")
-        if result:
-            try:
-                # 束电流数据在command字段中
-                current_str = result["command"][2:]
-                self.beam_current = float(current_str)
-                return self.beam_current
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析束电流错误: {e}")
-        return None
+        return self._read_monitor("beam_current")
     
     def get_heater_voltage_monitor(self):
         """26 - 获取加热器电压监测值"""
-        result = self.send_command("26")
-        if result:
-            try:
-                if result["data"]:
-                    voltage_str = result["data"][0]
-                else:
-                    voltage_str = result["command"][2:]
-                # 修复：设备返回的是mV，需要转换为V
-                self.heater_voltage = float(voltage_str) / 1000.0
-                return self.heater_voltage
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析加热器电压错误: {e}")
-        return None
+        # 修复：设备返回的是mV，MONITOR_COMMANDS中的换算系数将其转换为V
+        return self._read_monitor("heater_voltage")
     
     def get_heater_current_monitor(self):
         """28 - 获取加热器电流监测值"""
-        result = self.send_command("28", "1")
-        if result:
-            try:
-                if result["data"]:
-                    current_str = result["data"][0]
-                else:
-                    current_str = result["command"][2:]
-                self.heater_current = float(current_str)
-                return self.heater_current
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析加热器电流错误: {e}")
-        return None
+        return self._read_monitor("heater_current")
     
     def get_suppressor_voltage_monitor(self):
         """1E - 获取抑制器电压监测值"""
-        result = self.send_command("1E", "1")
-        if result:
-            try:
-                if result["data"]:
-                    voltage_str = result["data"][0]
-                else:
-                    voltage_str = result["command"][2:]
-                self.suppressor_voltage = float(voltage_str)
-                return self.suppressor_voltage
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析抑制器电压错误: {e}")
-        return None
+        return self._read_monitor("suppressor_voltage")
     
     def get_suppressor_current_monitor(self):
         """24 - 获取抑制器电流监测值"""
-        result = self.send_command("24")
-        if result:
-            try:
-                if result["data"]:
-                    current_str = result["data"][0]
-                else:
-                    current_str = result["command"][2:]
-                self.suppressor_current = float(current_str)
-                return self.suppressor_current
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析抑制器电流错误: {e}")
-        return None
+        return self._read_monitor("suppressor_current")
     
     def get_extractor_voltage_monitor(self):
         """14 - 获取提取器电压监测值"""
-        result = self.send_command("14", "1")
-        if result:
-            try:
-                if result["data"]:
-                    voltage_str = result["data"][0]
-                else:
-                    voltage_str = result["command"][2:]
-                self.extractor_voltage = float(voltage_str)
-                return self.extractor_voltage
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析提取器电压错误: {e}")
-        return None
+        return self._read_monitor("extractor_voltage")
     
     def get_extractor_current_monitor(self):
         """1A - 获取提取器电流监测值"""
-        result = self.send_command("1A")
-        if result:
-            try:
-                if result["data"]:
-                    current_str = result["data"][0]
-                else:
-                    current_str = result["command"][2:]
-                self.extractor_current = float(current_str)
-                return self.extractor_current
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析提取器电流错误: {e}")
-        return None
+        return self._read_monitor("extractor_current")
     
     def get_extractor_trip_current_monitor(self):
         """1C - 获取提取器跳闸电流设置值"""
-        result = self.send_command("1C")
-        if result:
-            try:
-                if result["data"]:
-                    current_str = result["data"][0]
-                else:
-                    current_str = result["command"][2:]
-                self.extractor_trip_current = float(current_str)
-                return self.extractor_trip_current
-            except (ValueError, IndexError) as e:
-                self.logger.error(f"解析提取器跳闸电流错误: {e}")
-        return None
+        return self._read_monitor("extractor_trip_current")
+    
+    def _read_monitor(self, attr):
+        """按MONITOR_COMMANDS中attr对应的行发送单条监测命令，解析数值并保存到该属性"""
+        cmd, args, _, scale, name = self._monitor_by_attr[attr]
+        return self._store_monitor_value(self.send_command(cmd, args), attr, scale, name)
     
     def update_all_monitors(self):
         """更新所有监测值"""
@@ -547,42 +769,79 @@ class EBM30N6_FEG_Controller:
             return
         
         try:
-            self.get_beam_voltage_monitor()
-            self.get_beam_current_monitor()
-            self.get_heater_current_monitor()
-            self.get_heater_voltage_monitor()
-            self.get_extractor_voltage_monitor()
-            self.get_extractor_current_monitor()
-            self.get_suppressor_voltage_monitor()
-            self.get_suppressor_current_monitor()
-            self.get_extractor_trip_current_monitor()
-            self.get_short_status()
+            commands = [(cmd, args) for cmd, args, _, _, _ in self.MONITOR_COMMANDS]
+            commands.append(("02", ""))
+            results = self.send_commands_batch(commands)
+            
+            with self._data_lock:
+                for (_, _, attr, scale, name), result in zip(self.MONITOR_COMMANDS, results):
+                    self._store_monitor_value(result, attr, scale, name)
+                self._apply_short_status(results[-1])
+                
+                self._publish_changes()
         except Exception as e:
-            self.logger.error(f"更新监测值时出错: {e}")
+            self.logger.error("更新监测值时出错: %s", e)
     
-    def update_system_status(self, status_hex):
-        """更新系统状态标志"""
-        try:
-            if len(status_hex) >= 8:
-                status_int = int(status_hex[:8], 16)
-                self.system_status["Power On Reset"] = bool(status_int & (1 << 8))
-                self.system_status["Vacuum Interlock"] = bool(status_int & (1 << 10))
-                self.system_status["Input Voltage out of range"] = bool(status_int & (1 << 12))
-                self.system_status["Beam Over Voltage Trip"] = bool(status_int & (1 << 13))
-                self.system_status["Beam Over Current Trip"] = bool(status_int & (1 << 14))
-                self.system_status["Extractor Over Current Trip"] = bool(status_int & (1 << 15))
-                self.system_status["Heater Open Circuit"] = bool(status_int & (1 << 16))
-                self.system_status["Heater Current Trip"] = bool(status_int & (1 << 17))
-                self.system_status["Over Temperature"] = bool(status_int & (1 << 18))
-                self.system_status["Suppressor Over Current Trip"] = bool(status_int & (1 << 19))
-                self.system_status["Arc Trip"] = bool(status_int & (1 << 20))
-                self.system_status["Suppressor Regulation Trip"] = bool(status_int & (1 << 21))
-                self.system_status["Heater Regulation Trip"] = bool(status_int & (1 << 22))
-                self.system_status["Extractor Regulation Trip"] = bool(status_int & (1 << 23))
-                self.system_status["Rx CRC Error"] = bool(status_int & (1 << 30))
-                self.system_status["Rx Error"] = bool(status_int & (1 << 31))
-        except Exception as e:
-            self.logger.error(f"更新系统状态错误: {e}")
+    def _publish_changes(self):
+        """将与上次发布相比发生变化的字段合并到待取走的变化中 - 调用时须持有_data_lock
+        
+        监测值按原始数值发布，由界面按各自的显示精度格式化后再比较，避免二次取整
+        """
+        current = self._collect_fields()
+        
+        changes = {key: value for key, value in current.items() if self._published.get(key) != value}
+        if changes:
+            self._published.update(changes)
+            self._pending_changes.update(changes)
+            self.sample_ready.set()
+    
+    def _collect_fields(self):
+        """收集全部测量值、输出状态和系统状态 - 调用时须持有_data_lock"""
+        fields = {attr: getattr(self, attr) for _, _, attr, _, _ in self.MONITOR_COMMANDS}
+        for attr, _ in self._OUTPUT_BITS:
+            fields[attr] = getattr(self, attr)
+        fields["system_status"] = dict(self.system_status)
+        return fields
+    
+    def snapshot(self):
+        """返回同一时刻的全部测量值和状态（普通字典，不会与监控线程的写入交错）"""
+        with self._data_lock:
+            return self._collect_fields()
+    
+    def take_changes(self):
+        """取走上次调用以来合并的所有变化，并清除sample_ready"""
+        with self._data_lock:
+            changes = self._pending_changes
+            self._pending_changes = {}
+            self.sample_ready.clear()
+        return changes
+    
+    def _store_monitor_value(self, result, attr, scale, name):
+        """从监测命令的响应中解析数值并保存到对应属性"""
+        if result:
+            try:
+                if result["data"]:
+                    value_str = result["data"][0]
+                else:
+                    value_str = result["command"][2:]
+                value = float(value_str) * scale
+                setattr(self, attr, value)
+                return value
+            except (ValueError, IndexError) as e:
+                self.logger.error("解析%s错误: %s", name, e)
+        return None
+    
+    def update_system_status(self, status_hex=None):
+        """更新系统状态标志
+        
+        status_hex仅为兼容旧的调用方式而保留，已不再使用 - 状态取自最近一次02响应解析出的_status_int
+        """
+        status_int = self._status_int
+        if status_int is None:
+            return
+        system_status = self.system_status
+        for name, mask in self._STATUS_BITS:
+            system_status[name] = (status_int & mask) != 0
     
     def start_monitoring(self, interval=2000):
         """开始实时监测"""
@@ -591,13 +850,14 @@ class EBM30N6_FEG_Controller:
             return
             
         self.monitoring = True
+        self._stop_event.clear()
         self.monitor_thread = threading.Thread(
             target=self._monitoring_loop,
             args=(interval/1000,),
             daemon=True
         )
         self.monitor_thread.start()
-        self.logger.info(f"开始实时监测，间隔: {interval}ms")
+        self.logger.info("开始实时监测，间隔: %sms", interval)
     
     def stop_monitoring(self):
         """停止实时监测"""
@@ -605,6 +865,7 @@ class EBM30N6_FEG_Controller:
             return
             
         self.monitoring = False
+        self._stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=3)
             if self.monitor_thread.is_alive():
@@ -616,25 +877,80 @@ class EBM30N6_FEG_Controller:
     def _monitoring_loop(self, interval):
         """监测循环"""
         cycle_count = 0
-        while self.monitoring and self.is_connected():
+        while not self._stop_event.is_set() and self.is_connected():
             try:
                 cycle_count += 1
-                self.logger.debug(f"监控周期 #{cycle_count}")
+                self.logger.debug("监控周期 #%s", cycle_count)
                 self.update_all_monitors()
-                time.sleep(interval)
             except Exception as e:
-                self.logger.error(f"监控循环错误: {e}")
-                time.sleep(interval)
+                self.logger.error("监控循环错误: %s", e)
+            # 等待下一个周期，停止时立即返回
+            self._stop_event.wait(interval)
         
-        self.logger.info(f"监控循环结束，总共运行 {cycle_count} 个周期")
+        self.logger.info("监控循环结束，总共运行 %s 个周期", cycle_count)
 
 class EBM30_GUI:
     """EBM30N6/FEG Graphical User Interface"""
     
+    # 状态指示灯画布中每行的高度（像素）
+    LED_ROW_HEIGHT = 22
+    ERROR_POPUP_INTERVAL = 2.0  # 同类错误弹窗的最小间隔(秒)
+    UI_POLL_INTERVAL = 50  # Tk主循环检查回调队列的间隔(毫秒)
+    
+    # 监测显示项: (名称, 单位, 控制器属性, 显示小数位数) - 删除"Heater Current Limit"项
+    MONITORS = [
+        ("Beam Energy Voltage", "V", "beam_voltage", 1),
+        ("Beam Energy Current", "μA", "beam_current", 2),
+        ("Heater Current", "mA", "heater_current", 1),
+        ("Heater Voltage", "V", "heater_voltage", 2),  # 修复：Heater Voltage 单位从 mV 转换为 V
+        ("Suppressor Voltage", "V", "suppressor_voltage", 1),
+        ("Suppressor Current", "μA", "suppressor_current", 2),
+        ("Extractor Voltage", "V", "extractor_voltage", 1),
+        ("Extractor Current", "μA", "extractor_current", 2),
+        ("Extractor Trip Current", "μA", "extractor_trip_current", 1)
+    ]
+    
     def __init__(self):
+        self.logger = logger
         self.controller = EBM30N6_FEG_Controller()
         self.root = tk.Tk()
-        self.status_frames = {}
+        # 构建完全部控件后再显示窗口，只做一次布局计算
+        self.root.withdraw()
+        self.controller.on_warning = self.show_warning_async
+        
+        # 所有可能阻塞的控制器调用都在这个单线程执行器中依次执行，不占用Tk主循环
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_futures = set()
+        # 其他线程不直接调用Tk，而是把(函数, 参数)放入队列，由Tk主循环定时取出执行
+        self._ui_queue = queue.Queue()
+        self._ui_poll_id = None
+        
+        # 上次显示的变量值（变量键 -> 上次写入的值），只重绘发生变化的项
+        self._monitor_cache = {}
+        # 待下发的设定值 {label: (unit, setter, value)}
+        self._pending_setpoints = {}
+        self._flush_id = None
+        
+        # 各类错误上次弹出对话框的时间
+        self._last_error_time = {}
+        
+        # 采样转发线程: 控制器每完成一次采样就把变化交给Tk主循环；
+        # 上一次的变化尚未显示完时不再提交，期间的新采样在控制器中合并
+        self._pump_stop = threading.Event()
+        self._display_idle = threading.Event()
+        self._display_idle.set()
+        
+        # 字体对象只创建一次，所有控件共享
+        self._font_title = tkfont.Font(family="Arial", size=10, weight="bold")
+        self._font_bold = tkfont.Font(family="Arial", size=9, weight="bold")
+        self._font_reg = tkfont.Font(family="Arial", size=9)
+        self._font_small = tkfont.Font(family="Arial", size=8)
+        
+        style = ttk.Style(self.root)
+        style.configure("Title.TLabel", font=self._font_title)
+        style.configure("Monitor.Treeview", font=self._font_reg, rowheight=22, background="#F9F9F9")
+        style.configure("Monitor.Treeview.Heading", font=self._font_bold)
+        
         self.setup_gui()
     
     def setup_gui(self):
@@ -662,7 +978,7 @@ class EBM30_GUI:
         enable_frame = ttk.Frame(left_frame)
         enable_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
         
-        ttk.Label(enable_frame, text="Enable Supply", font=('Arial', 10, 'bold')).grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(enable_frame, text="Enable Supply", style="Title.TLabel").grid(row=0, column=0, sticky=tk.W)
         
         # 使用StringVar来显示状态
         self.beam_var = tk.StringVar(value="off")
@@ -695,26 +1011,16 @@ class EBM30_GUI:
         status_frame = ttk.Frame(left_frame)
         status_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        ttk.Label(status_frame, text="System Status", font=('Arial', 10, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=(10, 5))
-        
-        # 创建状态指示器的画布和滚动条
-        status_canvas = tk.Canvas(status_frame, height=200, width=180)
-        status_scrollbar = ttk.Scrollbar(status_frame, orient="vertical", command=status_canvas.yview)
-        self.status_scrollable_frame = ttk.Frame(status_canvas)
-        
-        self.status_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: status_canvas.configure(scrollregion=status_canvas.bbox("all"))
-        )
+        ttk.Label(status_frame, text="System Status", style="Title.TLabel").grid(row=0, column=0, sticky=tk.W, pady=(10, 5))
         
-        status_canvas.create_window((0, 0), window=self.status_scrollable_frame, anchor="nw")
-        status_canvas.configure(yscrollcommand=status_scrollbar.set)
+        # 所有状态指示灯绘制在同一个画布上，并带滚动条
+        self.status_canvas = tk.Canvas(status_frame, height=200, width=180)
+        status_scrollbar = ttk.Scrollbar(status_frame, orient="vertical", command=self.status_canvas.yview)
+        self.status_canvas.configure(yscrollcommand=status_scrollbar.set)
         
-        status_canvas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.status_canvas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         status_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
         
-        # 在可滚动框架中创建状态指示器
-        self.status_vars = {}
         self.status_items = [
             "Power On Reset", "Vacuum Interlock", "Input Voltage out of range",
             "Beam Over Voltage Trip", "Beam Over Current Trip", "Extractor Over Current Trip",
@@ -723,25 +1029,24 @@ class EBM30_GUI:
             "Heater Regulation Trip", "Extractor Regulation Trip", "Rx CRC Error", "Rx Error"
         ]
         
-        for item in self.status_items:
-            var = tk.BooleanVar()
-            self.status_vars[item] = var
-            frame = ttk.Frame(self.status_scrollable_frame, width=180)
-            frame.pack(fill=tk.X, pady=1)
-            
-            # 状态指示器
-            indicator = tk.Canvas(frame, width=20, height=20)
-            indicator.pack(side=tk.LEFT, padx=(0, 5))
-            indicator.create_oval(2, 2, 18, 18, fill="light gray", tags="indicator")
-            
-            ttk.Label(frame, text=item, font=('Arial', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True)
-            
-            # 存储引用以便排序
-            self.status_frames[item] = {
-                "frame": frame,
-                "indicator": indicator,
-                "var": var
-            }
+        # 每行一个指示灯和一段文字，同一行的图元共用标签led_<i>以便整体移动
+        self._led_items = []
+        self._led_fills = []
+        self._led_rows = []
+        for i, item in enumerate(self.status_items):
+            y = i * self.LED_ROW_HEIGHT
+            oval = self.status_canvas.create_oval(2, y + 3, 18, y + 19, fill="light gray", tags=(f"led_{i}",))
+            self.status_canvas.create_text(25, y + 11, text=item, anchor=tk.W, font=self._font_small, tags=(f"led_{i}",))
+            self._led_items.append(oval)
+            self._led_fills.append("light gray")
+            self._led_rows.append(i)
+        
+        # 当前显示顺序（状态项索引列表）
+        self._last_order = list(range(len(self.status_items)))
+        
+        self.status_canvas.configure(
+            scrollregion=(0, 0, 180, len(self.status_items) * self.LED_ROW_HEIGHT)
+        )
         
         # 配置状态框架的网格权重
         status_frame.columnconfigure(0, weight=1)
@@ -800,6 +1105,8 @@ class EBM30_GUI:
         
         # 启用编辑复选框
         self.enable_limit_edit_var = tk.IntVar(value=0)
+        self._limit_edit_enabled = False
+        self.enable_limit_edit_var.trace_add("write", self._on_limit_edit_toggle)
         enable_limit_check = ttk.Checkbutton(
             limit_control_frame, 
             text="Enable Heater Current Limit Edit", 
@@ -820,40 +1127,23 @@ class EBM30_GUI:
         # 监测区域
         monitor_frame = ttk.LabelFrame(right_frame, text="Real-time Monitoring", padding="5")
         monitor_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        monitor_frame.columnconfigure(1, weight=1)
-        
-        # 创建监测表头
-        ttk.Label(monitor_frame, text="Parameter", font=('Arial', 9, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=2)
-        ttk.Label(monitor_frame, text="Value", font=('Arial', 9, 'bold')).grid(row=0, column=1, sticky=tk.W, pady=2)
-        
-        # 监测变量 - 删除"Heater Current Limit"项
-        self.monitor_vars = {}
-        monitor_items = [
-            ("Beam Energy Voltage", "V"),
-            ("Beam Energy Current", "μA"),
-            ("Heater Current", "mA"),
-            ("Heater Voltage", "V"),
-            ("Suppressor Voltage", "V"),
-            ("Suppressor Current", "μA"),
-            ("Extractor Voltage", "V"),
-            ("Extractor Current", "μA"),
-            ("Extractor Trip Current", "μA")
-            # 删除这一行：("Heater Current Limit", "mA")
-        ]
-        
-        for i, (name, unit) in enumerate(monitor_items):
-            row = i + 1
-            
-            # 参数名称
-            ttk.Label(monitor_frame, text=f"{name} ({unit}):").grid(row=row, column=0, sticky=tk.W, pady=2)
-            
-            # 监测值
-            monitor_var = tk.StringVar(value="0.0")
-            self.monitor_vars[f"{name}_monitor"] = monitor_var
-            monitor_display = tk.Label(monitor_frame, textvariable=monitor_var, 
-                                     background="#F9F9F9", relief="flat",
-                                     width=10, anchor="e", font=('Arial', 9))
-            monitor_display.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=2, padx=(5, 5))
+        monitor_frame.columnconfigure(0, weight=1)
+        
+        # 所有监测项放在同一个Treeview中，每项一行，行iid为控制器属性名
+        self.monitor_tree = ttk.Treeview(monitor_frame, columns=("value",), show=("tree", "headings"),
+                                         height=len(self.MONITORS), selectmode="none",
+                                         style="Monitor.Treeview")
+        self.monitor_tree.heading("#0", text="Parameter", anchor=tk.W)
+        self.monitor_tree.heading("value", text="Value", anchor=tk.E)
+        self.monitor_tree.column("#0", width=180, stretch=True)
+        self.monitor_tree.column("value", width=90, anchor=tk.E, stretch=False)
+        self.monitor_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 控制器属性 -> (缓存键, 写入该行数值的函数, 预先生成的格式字符串)
+        self._monitor_fields = {}
+        for name, unit, field, precision in self.MONITORS:
+            self.monitor_tree.insert("", tk.END, iid=field, text=f"{name} ({unit}):", values=("0.0",))
+            self._monitor_fields[field] = (field, partial(self.monitor_tree.set, field, "value"), f"%.{precision}f")
         
         # ===== 底部控制区域 =====
         bottom_frame = ttk.Frame(main_frame)
@@ -881,27 +1171,75 @@ class EBM30_GUI:
         control_frame.columnconfigure(2, weight=1)
         control_frame.columnconfigure(3, weight=1)
         
-        # 开始显示更新
-        self.update_display()
+        # 电源名称 -> (复选框变量, 控制器输出状态属性)
+        self._supply_map = {
+            "Beam": (self.beam_var, "beam_enabled"),
+            "Heater": (self.heater_var, "heater_enabled"),
+            "Suppressor": (self.suppressor_var, "suppressor_enabled"),
+            "Extractor": (self.extractor_var, "extractor_enabled")
+        }
+        # 控制器输出状态属性 -> 对应复选框变量
+        self._supply_vars = {attr: var for var, attr in self._supply_map.values()}
+        # 复选框变量可被用户点击修改，通过写入跟踪保持缓存与变量一致
+        for field, var in self._supply_vars.items():
+            var.trace_add("write", lambda *args, field=field, var=var: self._on_supply_var_write(field, var))
+        
+        # 控件数量在整个运行期间应保持不变 - 刷新只修改变量和画布项，不创建/销毁控件
+        self._live_widgets = 0
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self._track_widgets()
+        
+        # 开始接收控制器发布的变化
+        self._pump_thread = threading.Thread(target=self._pump, daemon=True)
+        self._pump_thread.start()
+        self._ui_poll_id = self.root.after(self.UI_POLL_INTERVAL, self._process_ui_queue)
+    
+    def _call_in_ui(self, func, *args):
+        """把回调交给Tk主循环执行，可从任意线程调用"""
+        self._ui_queue.put((func, args))
+    
+    def _process_ui_queue(self):
+        """在Tk主循环中执行其他线程提交的回调"""
+        try:
+            while True:
+                try:
+                    func, args = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                func(*args)
+        finally:
+            self._ui_poll_id = self.root.after(self.UI_POLL_INTERVAL, self._process_ui_queue)
+    
+    def show_warning_async(self, title, message):
+        """在Tk主循环中显示警告，可从任意线程调用"""
+        self._call_in_ui(messagebox.showwarning, title, message)
     
     def toggle_limit_edit(self):
         """切换加热电流限制编辑状态 - 修复版本"""
-        if self.enable_limit_edit_var.get() == 1:
+        if self._limit_edit_enabled:
             self.heater_limit_entry.config(state="normal")
             self.heater_limit_entry.focus_set()  # 自动聚焦到输入框
             # 保存当前值到临时变量，防止被实时更新覆盖
             self.temp_limit_value = self.heater_limit_var.get()
         else:
             self.heater_limit_entry.config(state="disabled")
-            # 如果取消编辑，恢复原来的值
-            self.heater_limit_var.set(self.controller.HEATER_CURRENT_LIMIT)
+            # 如果取消编辑，恢复原来的值（值未被修改时不再写入）
+            try:
+                current = self.heater_limit_var.get()
+            except tk.TclError:
+                current = None
+            if current != self.controller.HEATER_CURRENT_LIMIT:
+                self.heater_limit_var.set(self.controller.HEATER_CURRENT_LIMIT)
     
     def on_limit_focus_out(self):
         """当焦点离开限制输入框时的处理"""
-        if self.enable_limit_edit_var.get() == 1:
+        if self._limit_edit_enabled:
             # 如果仍在编辑状态，但不按回车，保持当前输入的值
             try:
                 new_value = float(self.heater_limit_entry.get())
+                if new_value == self.controller.HEATER_CURRENT_LIMIT:
+                    # 输入与当前限制相同，无需写入
+                    return
                 if new_value <= 0:
                     messagebox.showerror("Error", "Heater current limit must be greater than 0")
                     self.heater_limit_var.set(self.controller.HEATER_CURRENT_LIMIT)
@@ -922,9 +1260,10 @@ class EBM30_GUI:
                 self.heater_limit_var.set(self.controller.HEATER_CURRENT_LIMIT)
                 return
             
-            # 更新控制器中的限制值
-            self.controller.HEATER_CURRENT_LIMIT = new_limit
-            self.status_var.set(f"Heater current limit set to {new_limit} mA")
+            # 更新控制器中的限制值 - 与当前值相同时只退出编辑状态
+            if new_limit != self.controller.HEATER_CURRENT_LIMIT:
+                self.controller.HEATER_CURRENT_LIMIT = new_limit
+                self.status_var.set(f"Heater current limit set to {new_limit} mA")
             
             # 禁用编辑状态
             self.enable_limit_edit_var.set(0)
@@ -935,204 +1274,319 @@ class EBM30_GUI:
             # 恢复原来的值
             self.heater_limit_var.set(self.controller.HEATER_CURRENT_LIMIT)
     
+    def _run_async(self, func, on_done, *args):
+        """在后台线程执行控制器调用，完成后在Tk主循环中调用on_done(result, error)"""
+        future = self._executor.submit(func, *args)
+        self._pending_futures.add(future)
+        future.add_done_callback(lambda f: self._on_future_done(f, on_done))
+    
+    def _on_future_done(self, future, on_done):
+        """工作线程中的完成回调 - 转到Tk主循环处理结果"""
+        self._pending_futures.discard(future)
+        if future.cancelled():
+            # 退出时被取消
+            return
+        self._call_in_ui(self._finish_async, future, on_done)
+    
+    def _finish_async(self, future, on_done):
+        """在Tk主循环中取出后台调用的结果"""
+        try:
+            result = future.result()
+        except Exception as e:
+            on_done(None, e)
+        else:
+            on_done(result, None)
+    
+    def _show_error(self, key, title, message):
+        """在状态栏显示错误并弹出对话框；同一类错误2秒内重复出现时只显示在状态栏，避免模态对话框堆积"""
+        self.status_var.set(message)
+        now = time.monotonic()
+        if now - self._last_error_time.get(key, float("-inf")) < self.ERROR_POPUP_INTERVAL:
+            return
+        self._last_error_time[key] = now
+        messagebox.showerror(title, message)
+    
+    def _get_entry_value(self, var, label):
+        """读取输入框的数值，无效时提示错误并返回None"""
+        try:
+            return var.get()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error setting {label}: {e}")
+            return None
+    
+    def _apply_setpoint(self, label, unit, setter, value):
+        """登记设定值，50ms内的连续修改合并为一次下发（只保留最后的值）"""
+        self._pending_setpoints[label] = (unit, setter, value)
+        if self._flush_id is not None:
+            self.root.after_cancel(self._flush_id)
+        self._flush_id = self.root.after(50, self._flush_setpoints)
+    
+    def _flush_setpoints(self):
+        """每个参数只下发一次最新的设定值"""
+        self._flush_id = None
+        pending = self._pending_setpoints
+        self._pending_setpoints = {}
+        for label, (unit, setter, value) in pending.items():
+            self._send_setpoint(label, unit, setter, value)
+    
+    def _send_setpoint(self, label, unit, setter, value):
+        """在后台线程下发设定值，完成后报告结果"""
+        def done(result, error):
+            if error is not None:
+                self._show_error(label, "Error", f"Error setting {label}: {error}")
+            elif not result:
+                self._show_error(label, "Error", f"Failed to set {label}")
+            else:
+                self.status_var.set(f"{label.capitalize()} set to {value} {unit}")
+        
+        self._run_async(setter, done, value)
+    
     def reset_device(self):
         """Reset the device"""
-        try:
-            result = self.controller.reset_supply()
-            if result:
+        def done(result, error):
+            if error is not None:
+                self._show_error("reset", "Error", f"Error resetting device: {error}")
+            elif result:
                 messagebox.showinfo("Success", "Device reset successfully")
                 self.status_var.set("Device reset")
             else:
-                messagebox.showerror("Error", "Failed to reset device")
-                self.status_var.set("Reset failed")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error resetting device: {e}")
-            self.status_var.set("Reset error")
+                self._show_error("reset", "Error", "Failed to reset device")
+        
+        self._run_async(self.controller.reset_supply, done)
     
     def toggle_supply(self, supply, desired_state):
         """Toggle power supply state with error handling"""
-        try:
-            success = self.controller.switch_supply(supply, desired_state)
-            
-            if not success:
+        def done(success, error):
+            if error is not None:
+                # 异常情况
+                self._show_error(supply, "Error", f"Error controlling {supply}: {error}")
+            elif not success:
                 # 启动失败，显示错误并恢复复选框状态
-                messagebox.showerror("Error", f"Failed to {('enable' if desired_state else 'disable')} {supply}")
-                
-                # 根据设备实际状态恢复复选框
-                if supply == "Beam":
-                    self.beam_var.set("on" if self.controller.beam_enabled else "off")
-                elif supply == "Heater":
-                    self.heater_var.set("on" if self.controller.heater_enabled else "off")
-                elif supply == "Suppressor":
-                    self.suppressor_var.set("on" if self.controller.suppressor_enabled else "off")
-                elif supply == "Extractor":
-                    self.extractor_var.set("on" if self.controller.extractor_enabled else "off")
-                    
-                self.status_var.set(f"Failed to control {supply}")
+                self._show_error(supply, "Error", f"Failed to {('enable' if desired_state else 'disable')} {supply}")
             else:
                 # 成功
                 state_str = "enabled" if desired_state else "disabled"
                 self.status_var.set(f"{supply} {state_str} successfully")
-                
-        except Exception as e:
-            # 异常情况，恢复复选框到设备实际状态
-            messagebox.showerror("Error", f"Error controlling {supply}: {e}")
-            if supply == "Beam":
-                self.beam_var.set("on" if self.controller.beam_enabled else "off")
-            elif supply == "Heater":
-                self.heater_var.set("on" if self.controller.heater_enabled else "off")
-            elif supply == "Suppressor":
-                self.suppressor_var.set("on" if self.controller.suppressor_enabled else "off")
-            elif supply == "Extractor":
-                self.extractor_var.set("on" if self.controller.extractor_enabled else "off")
             
-            self.status_var.set(f"Error controlling {supply}")
+            # 根据设备实际状态同步复选框 - 命令被接受也不代表输出已切换（例如互锁）
+            var, attr = self._supply_map[supply]
+            state = "on" if self.controller.snapshot()[attr] else "off"
+            if self._monitor_cache.get(attr) != state:
+                var.set(state)
+        
+        self._run_async(self.controller.switch_supply, done, supply, desired_state)
     
     def set_beam_voltage(self):
         """Set beam voltage"""
-        try:
-            voltage = self.beam_voltage_var.get()
-            result = self.controller.set_beam_voltage(voltage)
-            if not result:
-                messagebox.showerror("Error", "Failed to set beam voltage")
-            else:
-                self.status_var.set(f"Beam voltage set to {voltage} V")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error setting beam voltage: {e}")
+        voltage = self._get_entry_value(self.beam_voltage_var, "beam voltage")
+        if voltage is not None:
+            self._apply_setpoint("beam voltage", "V", self.controller.set_beam_voltage, voltage)
     
     def set_heater_current(self):
         """Set heater current"""
-        try:
-            current = self.heater_current_var.get()
-            result = self.controller.set_heater_current(current)
-            if result and "error" in result:
-                # 错误已在控制器中处理
-                pass
-            elif result:
-                self.status_var.set(f"Heater current set to {current} mA")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error setting heater current: {e}")
+        current = self._get_entry_value(self.heater_current_var, "heater current")
+        if current is not None:
+            self._apply_setpoint("heater current", "mA", self.controller.set_heater_current, current)
     
     def set_suppressor_voltage(self):
         """Set suppressor voltage"""
-        try:
-            voltage = self.suppressor_voltage_var.get()
-            result = self.controller.set_suppressor_voltage(voltage)
-            if not result:
-                messagebox.showerror("Error", "Failed to set suppressor voltage")
-            else:
-                self.status_var.set(f"Suppressor voltage set to {voltage} V")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error setting suppressor voltage: {e}")
+        voltage = self._get_entry_value(self.suppressor_voltage_var, "suppressor voltage")
+        if voltage is not None:
+            self._apply_setpoint("suppressor voltage", "V", self.controller.set_suppressor_voltage, voltage)
     
     def set_extractor_voltage(self):
         """Set extractor voltage"""
-        try:
-            voltage = self.extractor_voltage_var.get()
-            result = self.controller.set_extractor_voltage(voltage)
-            if not result:
-                messagebox.showerror("Error", "Failed to set extractor voltage")
-            else:
-                self.status_var.set(f"Extractor voltage set to {voltage} V")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error setting extractor voltage: {e}")
+        voltage = self._get_entry_value(self.extractor_voltage_var, "extractor voltage")
+        if voltage is not None:
+            self._apply_setpoint("extractor voltage", "V", self.controller.set_extractor_voltage, voltage)
     
     def set_extractor_trip_current(self):
         """Set extractor trip current"""
-        try:
-            current = self.extractor_trip_var.get()
-            result = self.controller.set_extractor_trip_current(current)
-            if not result:
-                messagebox.showerror("Error", "Failed to set extractor trip current")
-            else:
-                self.status_var.set(f"Extractor trip current set to {current} μA")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error setting extractor trip current: {e}")
+        current = self._get_entry_value(self.extractor_trip_var, "extractor trip current")
+        if current is not None:
+            self._apply_setpoint("extractor trip current", "μA", self.controller.set_extractor_trip_current, current)
     
     def connect_device(self):
         """Connect to device - 使用默认端口"""
-        try:
-            success = self.controller.connect()
-            if success:
-                messagebox.showinfo("Success", f"Device connected successfully to {self.controller.DEFAULT_PORT}")
-                self.status_var.set(f"Connected to {self.controller.DEFAULT_PORT}")
+        port = self.controller.DEFAULT_PORT
+        
+        def done(success, error):
+            if error is not None:
+                messagebox.showerror("Error", f"Error connecting to device: {error}")
+                self.status_var.set("Connection error")
+            elif success:
+                messagebox.showinfo("Success", f"Device connected successfully to {port}")
+                self.status_var.set(f"Connected to {port}")
                 self.controller.start_monitoring()
             else:
-                self.status_var.set(f"Connection failed to {self.controller.DEFAULT_PORT}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error connecting to device: {e}")
-            self.status_var.set("Connection error")
+                self.status_var.set(f"Connection failed to {port}")
+        
+        self.status_var.set(f"Connecting to {port}...")
+        self._run_async(self.controller.connect, done)
     
     def disconnect_device(self):
         """Disconnect from device"""
-        self.controller.disconnect()
-        messagebox.showinfo("Information", "Device disconnected")
-        self.status_var.set(f"Not connected - Default Port: {self.controller.DEFAULT_PORT}")
-    
-    def update_display(self):
-        """Update display"""
-        # 更新监测值
-        self.monitor_vars["Beam Energy Voltage_monitor"].set(f"{self.controller.beam_voltage:.1f}")
-        self.monitor_vars["Beam Energy Current_monitor"].set(f"{self.controller.beam_current:.2f}")
-        self.monitor_vars["Heater Current_monitor"].set(f"{self.controller.heater_current:.1f}")
+        def done(result, error):
+            messagebox.showinfo("Information", "Device disconnected")
+            self.status_var.set(f"Not connected - Default Port: {self.controller.DEFAULT_PORT}")
         
-        # 修复：Heater Voltage 单位从 mV 转换为 V
-        self.monitor_vars["Heater Voltage_monitor"].set(f"{self.controller.heater_voltage:.2f}")
-        
-        self.monitor_vars["Suppressor Voltage_monitor"].set(f"{self.controller.suppressor_voltage:.1f}")
-        self.monitor_vars["Suppressor Current_monitor"].set(f"{self.controller.suppressor_current:.2f}")
-        self.monitor_vars["Extractor Voltage_monitor"].set(f"{self.controller.extractor_voltage:.1f}")
-        self.monitor_vars["Extractor Current_monitor"].set(f"{self.controller.extractor_current:.2f}")
-        self.monitor_vars["Extractor Trip Current_monitor"].set(f"{self.controller.extractor_trip_current:.1f}")
+        self._run_async(self.controller.disconnect, done)
+    
+    def _pump(self):
+        """后台线程：等待新的采样，在界面空闲时提交显示"""
+        controller = self.controller
+        while not self._pump_stop.is_set():
+            if not controller.sample_ready.wait(0.5):
+                continue
+            # 等待上一次的变化显示完毕
+            if not self._display_idle.wait(0.5):
+                continue
+            
+            changes = controller.take_changes()
+            if not changes:
+                continue
+            self._display_idle.clear()
+            self._call_in_ui(self._apply_snapshot, changes)
+    
+    def _apply_snapshot(self, changes):
+        """在Tk主循环中显示一次采样的变化"""
+        try:
+            self.update_display(changes)
+        finally:
+            self._display_idle.set()
+    
+    def update_display(self, changes):
+        """Update display - 只更新changes中给出的字段
+        
+        先收集需要写入的(写入函数, 新值)，与上次写入的值比较，
+        只写入变化的项，最后统一刷新一次界面
+        """
+        updates = []
+        leds_changed = False
+        monitor_fields = self._monitor_fields
+        supply_vars = self._supply_vars
+        
+        # changes中只有控制器已判定变化的数值，这里只为它们生成显示文本
+        for field, value in changes.items():
+            if field in monitor_fields:
+                # 更新监测值 - 按格式化后的显示文本比较
+                key, setter, fmt = monitor_fields[field]
+                self._queue_write(updates, key, setter, fmt % value)
+            elif field in supply_vars:
+                # 同步复选框状态到设备实际状态
+                self._queue_write(updates, field, supply_vars[field].set, "on" if value else "off")
+            elif field == "system_status":
+                # 更新状态指示器并按错误状态排序
+                leds_changed = self.update_leds(value)
         
         # 删除这一部分：更新加热电流限制显示（因为已经从监测区域删除了）
         # 只需要更新参数设置区域中的限制值
-        if self.enable_limit_edit_var.get() == 0:
-            self.heater_limit_var.set(self.controller.HEATER_CURRENT_LIMIT)
+        if not self._limit_edit_enabled:
+            self._queue_write(updates, "heater_limit", self.heater_limit_var.set, self.controller.HEATER_CURRENT_LIMIT)
         
-        # 同步复选框状态到设备实际状态
-        self.beam_var.set("on" if self.controller.beam_enabled else "off")
-        self.heater_var.set("on" if self.controller.heater_enabled else "off")
-        self.suppressor_var.set("on" if self.controller.suppressor_enabled else "off")
-        self.extractor_var.set("on" if self.controller.extractor_enabled else "off")
+        for setter, value in updates:
+            setter(value)
         
-        # 更新状态指示器并按错误状态排序
+        if updates or leds_changed:
+            self.root.update_idletasks()
+    
+    def _queue_write(self, updates, key, setter, value):
+        """值与缓存不同时记录一次待写入的(写入函数, 值)"""
+        if self._monitor_cache.get(key) != value:
+            self._monitor_cache[key] = value
+            updates.append((setter, value))
+    
+    def _on_limit_edit_toggle(self, *args):
+        """编辑复选框变化时记录状态，刷新显示时无需再查询Tcl变量"""
+        self._limit_edit_enabled = bool(self.enable_limit_edit_var.get())
+    
+    def _on_supply_var_write(self, field, var):
+        """复选框变量被写入（包括用户点击）时同步缓存"""
+        self._monitor_cache[field] = var.get()
+    
+    def update_leds(self, status_dict):
+        """更新状态指示灯颜色，并将错误项移到最前面；有任何改动时返回True"""
+        changed = False
         error_items = []
         normal_items = []
         
-        for status_name in self.status_items:
-            status_value = self.controller.system_status.get(status_name, False)
-            self.status_vars[status_name].set(status_value)
-            
-            # 更新指示器颜色
-            frame_info = self.status_frames[status_name]
+        for i, status_name in enumerate(self.status_items):
+            status_value = status_dict.get(status_name, False)
             if status_value:
-                color = "red"  # 错误状态为红色
-                error_items.append(status_name)
+                error_items.append(i)
             else:
-                color = "green"  # 正常状态为绿色
-                normal_items.append(status_name)
+                normal_items.append(i)
             
-            frame_info["indicator"].itemconfig("indicator", fill=color)
-        
-        # 重新打包状态项，错误项在前
-        for status_name in error_items + normal_items:
-            frame_info = self.status_frames[status_name]
-            frame_info["frame"].pack_forget()  # 从当前位置移除
-            frame_info["frame"].pack(fill=tk.X, pady=1)  # 按正确顺序重新添加
-        
-        # 500ms后再次更新
-        self.root.after(500, self.update_display)
+            # 只有颜色变化时才重新着色
+            color = "red" if status_value else "green"  # 错误状态为红色，正常状态为绿色
+            if self._led_fills[i] != color:
+                self._led_fills[i] = color
+                self.status_canvas.itemconfig(self._led_items[i], fill=color)
+                changed = True
+        
+        # 顺序不变时不做任何移动；否则只处理第一个不同位置之后的行
+        new_order = error_items + normal_items
+        if new_order != self._last_order:
+            start = next(row for row, (new, old) in enumerate(zip(new_order, self._last_order)) if new != old)
+            for row in range(start, len(new_order)):
+                i = new_order[row]
+                if self._led_rows[i] != row:
+                    self.status_canvas.move(f"led_{i}", 0, (row - self._led_rows[i]) * self.LED_ROW_HEIGHT)
+                    self._led_rows[i] = row
+            self._last_order = new_order
+            changed = True
+        
+        return changed
+    
+    def _iter_widgets(self):
+        """遍历窗口中的全部控件"""
+        pending = [self.root]
+        while pending:
+            widget = pending.pop()
+            pending.extend(widget.winfo_children())
+            yield widget
+    
+    def _track_widgets(self):
+        """调试用：为每个控件注册finalize回调，统计存活控件数"""
+        for widget in self._iter_widgets():
+            self._live_widgets += 1
+            weakref.finalize(widget, self._on_widget_finalized)
+        self.logger.debug("界面创建完成，共 %d 个控件", self._live_widgets)
+    
+    def _on_widget_finalized(self):
+        """控件对象被回收时减少存活计数"""
+        self._live_widgets -= 1
     
     def quit_app(self):
         """Exit application"""
-        self.controller.stop_monitoring()
-        self.controller.disconnect()
+        # 停止采样转发线程，取消尚未执行的定时回调，避免销毁窗口后仍被调用
+        self._pump_stop.set()
+        if self._flush_id is not None:
+            self.root.after_cancel(self._flush_id)
+            self._flush_id = None
+        if self._ui_poll_id is not None:
+            self.root.after_cancel(self._ui_poll_id)
+            self._ui_poll_id = None
+        
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("退出时控件数: %d (存活计数 %d)", sum(1 for _ in self._iter_widgets()), self._live_widgets)
+        # 取消排队中的控制器调用；停止监测和断开连接作为工作线程的最后一个任务，
+        # 排在正在执行的调用之后，以免断开后又重新打开串口，同时不阻塞Tk主循环
+        for future in list(self._pending_futures):
+            future.cancel()
+        self._executor.submit(self._shutdown_controller)
+        self._executor.shutdown(wait=False)
         self.root.quit()
         self.root.destroy()
     
+    def _shutdown_controller(self):
+        """工作线程中的最后一个任务：停止监测并断开串口"""
+        self.controller.stop_monitoring()
+        self.controller.disconnect()
+    
     def run(self):
         """Run application"""
+        self.root.deiconify()
         try:
             self.root.mainloop()
         except KeyboardInterrupt:
@@ -1142,6 +1596,7 @@ class EBM30_GUI:
 def main():
     """Main function"""
     print("Starting EBM30N6/FEG High Voltage Power Supply Controller...")
+    configure_logging()
     
     app = EBM30_GUI()
     app.run()